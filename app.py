@@ -7,6 +7,35 @@ from utils.csv_analyzer import CSVAnalyzer
 from utils.translator import TextTranslator
 from utils.visualizer import DataVisualizer
 import io
+import math
+import re
+import hashlib
+from html import escape
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+# Try to import pyarrow for fast CSV parsing, fallback to pandas if not available
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pac
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Number of responses above which the translated data is shown as a table
+TABLE_VIEW_THRESHOLD = 50
+
+# Number of feedback cards shown per page
+PAGE_SIZE = 25
+
+# pandas' default NA markers, so both CSV parsers treat the same cells as missing
+CSV_NA_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+]
+
+# Column names that look like form questions
+_QUESTION_RE = re.compile(r'(\?|¿|question|pregunta|texto|text|translated|mango|estás|estas|algo|favor|como|cómo)', re.I)
 
 # Configure page
 st.set_page_config(
@@ -112,6 +141,125 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def _read_csv_arrow(content: bytes) -> Optional[pd.DataFrame]:
+    """Parse UTF-8 CSV bytes with pyarrow, or return None when pandas must handle the file.
+    
+    pandas is needed for non-UTF-8 input (pyarrow reads it as binary columns),
+    duplicate or blank headers (which pandas renames), malformed rows, and
+    columns whose values pyarrow would rewrite on export: timestamps, which
+    pandas keeps as the original strings, and integers beyond int64, which
+    pyarrow turns into floats. Empty columns also go to pandas, which reads
+    them as float NaN rather than None.
+    """
+    try:
+        # Multi-threaded single-pass parse straight from the uploaded bytes
+        table = pac.read_csv(
+            pa.BufferReader(content),
+            read_options=pac.ReadOptions(use_threads=True),
+            # Paragraph answers contain line breaks inside quoted values
+            parse_options=pac.ParseOptions(newlines_in_values=True),
+            convert_options=pac.ConvertOptions(null_values=CSV_NA_VALUES, strings_can_be_null=True)
+        )
+    except pa.ArrowInvalid:
+        return None
+    
+    names = table.schema.names
+    if len(set(names)) != len(names) or any(not name.strip() for name in names):
+        return None
+    for field, column in zip(table.schema, table.columns):
+        if pa.types.is_binary(field.type) or pa.types.is_large_binary(field.type) \
+                or pa.types.is_temporal(field.type) or pa.types.is_null(field.type):
+            return None
+        if pa.types.is_floating(field.type) and column.null_count < len(column) \
+                and pc.max(pc.abs(column)).as_py() >= 2 ** 63:
+            return None
+    
+    return table.to_pandas()
+
+@st.cache_data(show_spinner=False)
+def load_csv(content: bytes) -> Optional[pd.DataFrame]:
+    """Parse uploaded CSV bytes, trying common encodings."""
+    if PYARROW_AVAILABLE:
+        df = _read_csv_arrow(content)
+        if df is not None:
+            return df
+    
+    try:
+        # Try UTF-8 first
+        return pd.read_csv(io.BytesIO(content), encoding='utf-8')
+    except UnicodeDecodeError:
+        # Fallback to other encodings
+        for encoding in ['latin-1', 'iso-8859-1', 'cp1252']:
+            try:
+                return pd.read_csv(io.StringIO(content.decode(encoding)))
+            except:
+                continue
+    return None
+
+@st.cache_data(show_spinner=False)
+def analyze_csv(data_hash: str, _df: pd.DataFrame) -> Dict[str, Any]:
+    """Analyze a loaded CSV once per file content."""
+    return CSVAnalyzer().analyze_dataframe(_df)
+
+class PartialTranslation(Exception):
+    """Raised by translate_csv when some texts were kept untranslated.
+    
+    st.cache_data does not cache raised exceptions, so partial results reach
+    the caller through this exception without being cached.
+    """
+    
+    def __init__(self, translated_df: pd.DataFrame, column_translations: Dict[str, str]):
+        super().__init__("Some texts were kept untranslated")
+        self.translated_df = translated_df
+        self.column_translations = column_translations
+
+@st.cache_data(show_spinner=False)
+def translate_csv(data_hash: str, _df: pd.DataFrame, columns: Tuple[str, ...],
+                  target_language: str) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """Translate a loaded CSV once per file content, columns and target language.
+    
+    Raises PartialTranslation instead of returning when some texts failed to
+    translate, so they are retried on the next run.
+    """
+    translator = TextTranslator()
+    translated_df = translator.translate_dataframe(_df, list(columns), target_language)
+    if translator.had_failures:
+        raise PartialTranslation(translated_df, translator.column_translations)
+    return translated_df, translator.column_translations
+
+def html_text(value: Any) -> str:
+    """Escape a value for the card HTML, keeping its line breaks."""
+    return escape(str(value)).replace('\r\n', '\n').replace('\n', '<br>')
+
+def csv_stream(df: pd.DataFrame, original_df: Optional[pd.DataFrame] = None,
+               original_columns: Optional[List[str]] = None, chunk_size: int = 10000) -> Iterator[str]:
+    """Yield a DataFrame as CSV text, one chunk of rows at a time.
+    
+    When original_df is given, the original values of original_columns are
+    appended chunk by chunk as ``<column>_original`` columns.
+    """
+    def with_originals(chunk: pd.DataFrame) -> pd.DataFrame:
+        if original_df is None or not original_columns:
+            return chunk
+        originals = original_df.loc[chunk.index, original_columns].add_suffix('_original')
+        return pd.concat([chunk, originals], axis=1)
+    
+    yield with_originals(df.iloc[:0]).to_csv(index=False)
+    for start in range(0, len(df), chunk_size):
+        yield with_originals(df.iloc[start:start + chunk_size]).to_csv(index=False, header=False)
+
+def build_csv(df: pd.DataFrame, original_df: Optional[pd.DataFrame] = None,
+              original_columns: Optional[List[str]] = None) -> bytes:
+    """Serialize a DataFrame to UTF-8 CSV bytes with csv_stream().
+    
+    Chunks are encoded as they are produced, so the full CSV is never held
+    as a str next to its bytes.
+    """
+    buffer = io.BytesIO()
+    for chunk in csv_stream(df, original_df, original_columns):
+        buffer.write(chunk.encode('utf-8'))
+    return buffer.getvalue()
+
 def main():
     st.title("📊 CSV Data Analyzer & Translator")
     st.markdown("Upload your CSV file to analyze, translate, and visualize your data in a beautiful format!")
@@ -125,6 +273,14 @@ def main():
         st.session_state.analysis_results = None
     if 'column_translations' not in st.session_state:
         st.session_state.column_translations = {}
+    if 'data_hash' not in st.session_state:
+        st.session_state.data_hash = None
+    if 'original_data' not in st.session_state:
+        st.session_state.original_data = None
+    if 'translated_columns' not in st.session_state:
+        st.session_state.translated_columns = []
+    if 'translated_csv' not in st.session_state:
+        st.session_state.translated_csv = None
     
     # File upload section
     st.header("🔄 Upload CSV File")
@@ -136,26 +292,13 @@ def main():
     
     if uploaded_file is not None:
         try:
-            # Read CSV with encoding detection
-            try:
-                # Try UTF-8 first
-                content = uploaded_file.read()
-                uploaded_file.seek(0)
-                df = pd.read_csv(uploaded_file, encoding='utf-8')
-            except UnicodeDecodeError:
-                # Fallback to other encodings
-                uploaded_file.seek(0)
-                content = uploaded_file.read()
-                for encoding in ['latin-1', 'iso-8859-1', 'cp1252']:
-                    try:
-                        df = pd.read_csv(io.StringIO(content.decode(encoding)))
-                        break
-                    except:
-                        continue
-                else:
-                    st.error("Could not decode the CSV file. Please ensure it's properly encoded.")
-                    return
+            content = uploaded_file.getvalue()
+            df = load_csv(content)
+            if df is None:
+                st.error("Could not decode the CSV file. Please ensure it's properly encoded.")
+                return
             
+            st.session_state.data_hash = hashlib.sha1(content).hexdigest()
             st.session_state.data = df
             st.success(f"✅ Successfully loaded CSV with {len(df)} rows and {len(df.columns)} columns!")
             
@@ -181,7 +324,7 @@ def main():
         st.header("🔍 Data Analysis")
         
         analyzer = CSVAnalyzer()
-        analysis = analyzer.analyze_dataframe(df)
+        analysis = analyze_csv(st.session_state.data_hash, df)
         st.session_state.analysis_results = analysis
         
         # Display analysis results
@@ -189,16 +332,17 @@ def main():
         
         with col1:
             st.subheader("📋 Column Information")
-            analysis_df = pd.DataFrame([
-                {
-                    'Column': col,
-                    'Type': info['type'],
-                    'Non-null Count': info['non_null_count'],
-                    'Null Count': info['null_count'],
-                    'Sample Values': ', '.join(map(str, info['sample_values'][:3]))
-                }
-                for col, info in analysis['columns'].items()
-            ])
+            columns_df = analysis['columns_df']
+            analysis_df = pd.DataFrame({
+                'Column': columns_df.index,
+                'Type': columns_df['type'].to_numpy(),
+                'Non-null Count': columns_df['non_null_count'].to_numpy(),
+                'Null Count': columns_df['null_count'].to_numpy(),
+                'Sample Values': [
+                    ', '.join(map(str, analysis['sample_values'][col][:3]))
+                    for col in columns_df.index
+                ]
+            })
             st.dataframe(analysis_df, use_container_width=True)
         
         with col2:
@@ -226,14 +370,28 @@ def main():
             
             if st.button("🔄 Translate Data"):
                 with st.spinner("🌸 Translating data..."):
-                    translator = TextTranslator()
-                    translated_df = translator.translate_dataframe(
-                        df.copy(), 
-                        text_columns, 
-                        target_language
-                    )
+                    try:
+                        translated_df, column_translations = translate_csv(
+                            st.session_state.data_hash,
+                            df,
+                            tuple(text_columns),
+                            target_language
+                        )
+                        complete = True
+                    except PartialTranslation as partial:
+                        translated_df, column_translations = partial.translated_df, partial.column_translations
+                        complete = False
+                    st.session_state.column_translations.update(column_translations)
                     st.session_state.translated_data = translated_df
-                    st.success("✅ Translation completed!")
+                    # Originals are looked up from the untranslated frame instead of copied
+                    st.session_state.original_data = df
+                    st.session_state.translated_columns = list(text_columns)
+                    # Rebuilt by the download section for the new translation
+                    st.session_state.translated_csv = None
+                    if complete:
+                        st.success("✅ Translation completed!")
+                    else:
+                        st.warning("⚠️ Translation completed, but some texts were kept untranslated.")
         else:
             st.info("No text columns found for translation.")
 
@@ -245,67 +403,75 @@ def main():
             # Beautiful card view for translated responses
             card_data = st.session_state.translated_data
             
-            for idx, row in card_data.iterrows():
-                with st.container():
-                    st.markdown('<div class="feedback-card">', unsafe_allow_html=True)
-                    st.markdown("### 🌸 Translated Feedback")
-                    
-                    # Get columns in proper order (timestamp first, then text columns)
-                    all_cols = [col for col in st.session_state.translated_data.columns if not col.endswith('_original')]
-                    timestamp_cols = [col for col in all_cols if 'timestamp' in col.lower() or 'date' in col.lower() or 'time' in col.lower()]
-                    text_cols = [col for col in all_cols if col not in timestamp_cols]
-                    ordered_cols = timestamp_cols + text_cols
-                    
+            # Large frames default to the Arrow-backed table, cards stay available paginated
+            card_view = st.toggle("Card view", value=len(card_data) <= TABLE_VIEW_THRESHOLD)
+            
+            if not card_view:
+                st.dataframe(card_data, use_container_width=True)
+            else:
+                # Get columns in proper order (timestamp first, then text columns)
+                all_cols = list(card_data.columns)
+                lowered = {col: str(col).lower() for col in all_cols}
+                timestamp_cols = [col for col in all_cols if 'timestamp' in lowered[col] or 'date' in lowered[col] or 'time' in lowered[col]]
+                text_cols = [col for col in all_cols if col not in timestamp_cols]
+                ordered_cols = timestamp_cols + text_cols
+                
+                # Determine emoji, label and category once per column:
+                # timestamp columns, question columns (the column name is the question
+                # and the value is the answer) and regular columns
+                emoji_label = {}
+                for col_name in timestamp_cols:
+                    emoji_label[col_name] = ("📅", "Response Submitted", "timestamp")
+                for col_name in text_cols:
+                    if _QUESTION_RE.search(str(col_name)):
+                        # Get translated column name if available
+                        translated_question = st.session_state.column_translations.get(col_name, col_name)
+                        emoji_label[col_name] = ("📝", html_text(translated_question), "question")
+                    else:
+                        emoji_label[col_name] = ("📄", html_text(str(col_name).replace('_', ' ').title()), "regular")
+                
+                # Only render the cards of the current page
+                total_pages = max(1, math.ceil(len(card_data) / PAGE_SIZE))
+                page = 1
+                if total_pages > 1:
+                    page = st.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1)
+                    st.caption(f"Showing page {page} of {total_pages} ({len(card_data)} responses)")
+                page_data = card_data.iloc[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+                
+                # Plain dict rows avoid building a Series per row
+                records = page_data[ordered_cols].to_dict('records')
+                
+                # Build each card as one HTML block and send the whole page in one message
+                cards_html = []
+                for row in records:
+                    html_parts = ['<div class="feedback-card">', '<h3>🌸 Translated Feedback</h3>']
+                
                     # Display each column with emojis and formatting in order
                     for col_name in ordered_cols:
-                        if col_name not in row.index:
-                            continue
                         value = row[col_name]
-                        
-                        # Determine emoji based on column name/content and position
-                        if 'timestamp' in col_name.lower() or 'date' in col_name.lower() or 'time' in col_name.lower():
-                            emoji = "📅"
-                            label = "Response Submitted"
-                            st.markdown(f"**{emoji} {label}:** {value}")
+                        emoji, label, category = emoji_label[col_name]
+                    
+                        if category == "timestamp":
+                            html_parts.append(f'<p><b>{emoji} {label}:</b> {html_text(value)}</p>')
+                            continue
+                    
+                        # Handle empty/NaN values
+                        if pd.isna(value) or str(value).strip() == '':
+                            value_display = "No response"
                         else:
-                            # For non-timestamp columns, the column name is the question and the value is the answer
-                            col_name_str = str(col_name).lower()
-                            
-                            # Check if column name looks like a question (improved detection)
-                            if ('?' in col_name or '¿' in col_name or 
-                                'question' in col_name_str or 'pregunta' in col_name_str or
-                                'texto' in col_name_str or 'text' in col_name_str or
-                                'translated' in col_name_str or 'mango' in col_name_str or
-                                'estás' in col_name_str or 'estas' in col_name_str or
-                                'algo' in col_name_str or 'favor' in col_name_str or
-                                'por favor' in col_name_str or 'como' in col_name_str or
-                                'cómo' in col_name_str):
-                                # Get translated column name if available
-                                translated_question = st.session_state.column_translations.get(col_name, col_name)
-                                
-                                # Handle empty/NaN values
-                                if pd.isna(value) or str(value).strip() == '':
-                                    answer_display = "No response"
-                                else:
-                                    answer_display = str(value)
-                                
-                                # Display both question (from column name) and answer (from value)
-                                st.markdown(f"**📝 Question:** {translated_question}")
-                                st.markdown(f"**💬 Answer:** {answer_display}")
-                            else:
-                                # Regular column display
-                                emoji = "📄"
-                                label = col_name.replace('_', ' ').title()
-                                
-                                # Handle empty/NaN values
-                                if pd.isna(value) or str(value).strip() == '':
-                                    value_display = "No response"
-                                else:
-                                    value_display = str(value)
-                                    
-                                st.markdown(f"**{emoji} {label}:** {value_display}")
+                            value_display = html_text(value)
                     
-                    st.markdown('</div>', unsafe_allow_html=True)
+                        if category == "question":
+                            # Display both question (from column name) and answer (from value)
+                            html_parts.append(f'<p><b>{emoji} Question:</b> {label}</p>')
+                            html_parts.append(f'<p><b>💬 Answer:</b> {value_display}</p>')
+                        else:
+                            html_parts.append(f'<p><b>{emoji} {label}:</b> {value_display}</p>')
+                
+                    html_parts.append('</div>')
+                    cards_html.append(''.join(html_parts))
+                
+                st.markdown(''.join(cards_html), unsafe_allow_html=True)
         
         else:
             # Original data display
@@ -333,13 +499,17 @@ def main():
         st.header("💾 Download Results")
         
         if st.session_state.translated_data is not None:
-            csv_buffer = io.StringIO()
-            st.session_state.translated_data.to_csv(csv_buffer, index=False)
-            csv_string = csv_buffer.getvalue()
+            # Serialize once per translation, not on every rerun
+            if st.session_state.translated_csv is None:
+                st.session_state.translated_csv = build_csv(
+                    st.session_state.translated_data,
+                    st.session_state.original_data,
+                    st.session_state.translated_columns
+                )
             
             st.download_button(
                 label="📥 Download Translated CSV",
-                data=csv_string,
+                data=st.session_state.translated_csv,
                 file_name="translated_data.csv",
                 mime="text/csv"
             )
@@ -1,7 +1,82 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
+import importlib.util
+import io
 import re
+from concurrent.futures import ThreadPoolExecutor
+
+# Try to import RE2 (DFA-based, linear time) for pattern matching, fallback to re if not available
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+# Check for pyarrow, needed by pandas for Arrow-backed string columns, fallback to object dtype if not available
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+def _compile_pattern(pattern: str, ignore_case: bool = False):
+    """Compile a pattern with RE2 when available, otherwise with re."""
+    if RE2_AVAILABLE:
+        return re2.compile(f"(?i){pattern}" if ignore_case else pattern)
+    return re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+
+def _is_arrow_backed(dtype) -> bool:
+    """Check if a dtype stores its values in a pyarrow array."""
+    return isinstance(dtype, pd.ArrowDtype) or getattr(dtype, 'storage', None) == 'pyarrow'
+
+def _shrink_series(series: pd.Series, lossless: bool = True) -> pd.Series:
+    """Downcast a numpy numeric series to the smallest dtype holding its values."""
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype) or not isinstance(dtype, np.dtype):
+        return series
+    if pd.api.types.is_unsigned_integer_dtype(dtype):
+        return pd.to_numeric(series, downcast='unsigned')
+    if pd.api.types.is_integer_dtype(dtype):
+        # Non-negative columns fit in twice the range as unsigned integers
+        downcast = 'unsigned' if len(series) and series.min() >= 0 else 'integer'
+        return pd.to_numeric(series, downcast=downcast)
+    if pd.api.types.is_float_dtype(dtype):
+        downcast = pd.to_numeric(series, downcast='float')
+        if not lossless or np.array_equal(
+            downcast.to_numpy(dtype=np.float64), series.to_numpy(dtype=np.float64), equal_nan=True
+        ):
+            return downcast
+    return series
+
+def shrink_numeric(df: pd.DataFrame, lossless: bool = True) -> pd.DataFrame:
+    """Return a shallow copy of df with numeric columns downcast to smaller dtypes.
+    
+    With lossless=False, float64 columns become float32 even if values are
+    rounded, which halves the memory traffic of reductions like corr().
+    """
+    shrunk = df.copy(deep=False)
+    for i in range(len(df.columns)):
+        series = df.iloc[:, i]
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            shrunk.isetitem(i, _shrink_series(series, lossless))
+    return shrunk
+
+def _count_nulls(series: pd.Series):
+    """Return (non_null_count, null_count) for a column using raw numpy arrays."""
+    dtype = series.dtype
+    if _is_arrow_backed(dtype):
+        # Arrow arrays track their null count, no scan needed
+        null_count = series.array.__arrow_array__().null_count
+        return len(series) - null_count, null_count
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Missing values have code -1, no need to materialize the values
+        null_count = int((series.cat.codes.to_numpy() == -1).sum())
+        return len(series) - null_count, null_count
+    if pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype):
+        # numpy integer arrays cannot hold missing values
+        return len(series), 0
+    if pd.api.types.is_float_dtype(dtype) and isinstance(dtype, np.dtype):
+        null_count = int(np.isnan(series.to_numpy()).sum())
+        return len(series) - null_count, null_count
+    null_count = int(pd.isna(series.to_numpy()).sum())
+    return len(series) - null_count, null_count
 
 class CSVAnalyzer:
     """Analyzes CSV data structure and provides insights."""
@@ -12,6 +87,29 @@ class CSVAnalyzer:
             r'\d{2}[-/]\d{2}[-/]\d{4}',  # MM-DD-YYYY or MM/DD/YYYY
             r'\d{1,2}[-/]\d{1,2}[-/]\d{4}',  # M-D-YYYY or M/D/YYYY
         ]
+        # All date patterns in a single precompiled alternation
+        self._date_re = _compile_pattern("|".join(f"(?:{p})" for p in self.date_patterns))
+        
+        # Simple heuristics for common languages, based on characteristic characters
+        language_patterns = [
+            ('Spanish', r'[áéíóúñü]', True),
+            ('French', r'[àâäçéèêëïîôùûüÿ]', True),
+            ('German', r'[äöüß]', True),
+            ('Italian', r'[àèéìíîòóù]', True),
+            ('Portuguese', r'[ãâáàçéêíôõú]', True),
+            ('Russian', r'[а-яё]', True),
+            ('Chinese', r'[一-龯]', False),
+            ('Japanese', r'[ひらがなカタカナ]', False),
+            ('Korean', r'[가-힣]', False),
+        ]
+        self._lang_probes = [
+            (language, _compile_pattern(pattern, ignore_case))
+            for language, pattern, ignore_case in language_patterns
+        ]
+        # Union of all the characters above, used for a single scan of the text
+        self._lang_chars_re = _compile_pattern(
+            "|".join(pattern for _, pattern, _ in language_patterns), ignore_case=True
+        )
     
     def analyze_dataframe(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze the structure and content of a DataFrame."""
@@ -22,140 +120,262 @@ class CSVAnalyzer:
             'columns': {},
             'text_columns': [],
             'numeric_columns': [],
-            'date_columns': [],
-            'total_missing_values': df.isnull().sum().sum()
+            'date_columns': []
         }
         
-        for column in df.columns:
-            col_analysis = self._analyze_column(df[column])
+        # Analyze a compact copy; memory usage above is reported for the original frame
+        df = self._optimize_dtypes(df)
+        
+        # Columns are independent and pandas/numpy kernels release the GIL,
+        # so analyze them concurrently and fold the results in column order
+        with ThreadPoolExecutor() as executor:
+            column_results = list(executor.map(
+                lambda column: (column, self._analyze_column(df[column])),
+                df.columns
+            ))
+        
+        # Fields shared by every column are stored column-oriented (one array
+        # per field); analysis['columns'] keeps only the type-specific stats
+        summary_fields = ('type', 'non_null_count', 'null_count', 'unique_count')
+        summary = {field: [] for field in summary_fields}
+        sample_values = {}
+        for column, col_analysis in column_results:
+            for field in summary_fields:
+                summary[field].append(col_analysis.pop(field))
+            sample_values[column] = col_analysis.pop('sample_values')
             analysis['columns'][column] = col_analysis
             
             # Categorize columns
-            if col_analysis['type'] == 'text':
+            col_type = summary['type'][-1]
+            if col_type == 'text':
                 analysis['text_columns'].append(column)
-            elif col_analysis['type'] == 'numeric':
+            elif col_type == 'numeric':
                 analysis['numeric_columns'].append(column)
-            elif col_analysis['type'] == 'datetime':
+            elif col_type == 'datetime':
                 analysis['date_columns'].append(column)
         
+        analysis['total_missing_values'] = sum(summary['null_count'])
+        analysis['columns_df'] = pd.DataFrame(summary, index=pd.Index(list(df.columns), dtype=object))
+        # Sample values are lists, so they are kept in a separate dict
+        analysis['sample_values'] = sample_values
+        
         return analysis
     
+    def _optimize_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return a shallow copy of df with compact dtypes for faster analysis.
+        
+        Integers are downcast, floats only when no precision is lost,
+        low-cardinality string columns become categoricals and other string
+        columns are stored as Arrow strings.
+        """
+        optimized = df.copy(deep=False)
+        
+        for i, column in enumerate(df.columns):
+            series = df.iloc[:, i]
+            dtype = series.dtype
+            
+            if pd.api.types.is_numeric_dtype(dtype) and isinstance(dtype, np.dtype):
+                optimized.isetitem(i, _shrink_series(series))
+            elif dtype == object or pd.api.types.is_string_dtype(dtype):
+                if len(series) and series.nunique() / len(series) < 0.5:
+                    optimized.isetitem(i, series.astype('category'))
+                elif PYARROW_AVAILABLE and not _is_arrow_backed(dtype) \
+                        and pd.api.types.infer_dtype(series, skipna=True) == 'string':
+                    optimized.isetitem(i, series.astype(pd.StringDtype('pyarrow')))
+        
+        return optimized
+    
     def _analyze_column(self, series: pd.Series) -> Dict[str, Any]:
         """Analyze a single column of data."""
+        non_null_count, null_count = _count_nulls(series)
+        # Drop nulls once and share the result with the helpers below
+        non_null = series.dropna()
+        # Values converted while detecting the type are reused for the statistics
+        col_type, numeric_values = self._classify_column(series, non_null)
         col_info = {
-            'type': self._detect_column_type(series),
-            'non_null_count': series.count(),
-            'null_count': series.isnull().sum(),
+            'type': col_type,
+            'non_null_count': non_null_count,
+            'null_count': null_count,
             'unique_count': series.nunique(),
-            'sample_values': self._get_sample_values(series)
+            'sample_values': self._get_sample_values(series, non_null=non_null)
         }
         
         # Add type-specific analysis
         if col_info['type'] == 'numeric':
-            col_info.update(self._analyze_numeric_column(series))
+            col_info.update(self._analyze_numeric_column(series, numeric_values))
         elif col_info['type'] == 'text':
-            col_info.update(self._analyze_text_column(series))
+            col_info.update(self._analyze_text_column(series, non_null))
         elif col_info['type'] == 'datetime':
             col_info.update(self._analyze_datetime_column(series))
         
         return col_info
     
-    def _detect_column_type(self, series: pd.Series) -> str:
-        """Detect the type of data in a column."""
+    def _classify_column(self, series: pd.Series,
+                         non_null: Optional[pd.Series] = None) -> Tuple[str, Optional[np.ndarray]]:
+        """Detect the type of a column, along with the float64 values of the
+        non-null entries when a text column had to be converted to find out."""
         # Remove null values for analysis
-        non_null_series = series.dropna()
+        non_null_series = series.dropna() if non_null is None else non_null
         
         if len(non_null_series) == 0:
-            return 'empty'
+            return 'empty', None
         
-        # Check if numeric
-        if pd.api.types.is_numeric_dtype(series):
-            return 'numeric'
+        # Cheap dtype-only checks first: these dtypes cannot hold date strings
+        dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_numeric_dtype(dtype):
+            return 'numeric', None
         
         # Check if datetime
-        if pd.api.types.is_datetime64_any_dtype(series):
-            return 'datetime'
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return 'datetime', None
+        
+        # Categorical columns with numeric or datetime categories need no value scan
+        if isinstance(dtype, pd.CategoricalDtype):
+            categories = dtype.categories
+            if pd.api.types.is_numeric_dtype(categories.dtype):
+                return 'numeric', None
+            if pd.api.types.is_datetime64_any_dtype(categories.dtype):
+                return 'datetime', None
         
         # Check if string data contains dates
         if self._contains_dates(non_null_series):
-            return 'datetime'
+            return 'datetime', None
         
-        # Check if string data can be converted to numeric
-        try:
-            pd.to_numeric(non_null_series, errors='raise')
-            return 'numeric'
-        except (ValueError, TypeError):
-            pass
+        # Check if string data can be converted to numeric, on a sample first
+        # so text columns are rejected without converting the whole column
+        if pd.to_numeric(non_null_series.head(50), errors='coerce').notna().all():
+            numeric_values = pd.to_numeric(non_null_series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            if not np.isnan(numeric_values).any():
+                return 'numeric', numeric_values
         
-        return 'text'
+        return 'text', None
     
     def _contains_dates(self, series: pd.Series) -> bool:
         """Check if a text series contains date-like patterns."""
         sample_size = min(100, len(series))
         sample_values = series.head(sample_size).astype(str)
         
-        date_matches = 0
-        for value in sample_values:
-            for pattern in self.date_patterns:
-                if re.search(pattern, value):
-                    date_matches += 1
-                    break
+        if RE2_AVAILABLE:
+            # pandas only accepts re patterns, so run the RE2 pattern directly
+            date_matches = sum(1 for value in sample_values.tolist() if self._date_re.search(value))
+        else:
+            date_matches = sample_values.str.contains(self._date_re, regex=True, na=False).sum()
         
         # Consider it a date column if more than 50% of samples match date patterns
         return date_matches / sample_size > 0.5
     
-    def _get_sample_values(self, series: pd.Series, n: int = 5) -> List[Any]:
+    def _get_sample_values(self, series: pd.Series, n: int = 5, non_null: Optional[pd.Series] = None) -> List[Any]:
         """Get sample values from a series."""
-        non_null_values = series.dropna()
+        non_null_values = series.dropna() if non_null is None else non_null
         if len(non_null_values) == 0:
             return []
         
         sample_size = min(n, len(non_null_values))
         return non_null_values.head(sample_size).tolist()
     
-    def _analyze_numeric_column(self, series: pd.Series) -> Dict[str, Any]:
+    def _analyze_numeric_column(self, series: pd.Series, numeric_values: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """Analyze numeric column statistics."""
-        numeric_series = pd.to_numeric(series, errors='coerce')
+        if numeric_values is None:
+            numeric_series = pd.to_numeric(series, errors='coerce')
+            numeric_values = numeric_series.to_numpy(dtype=np.float64, na_value=np.nan)
+        
+        # Compute all statistics back-to-back on one contiguous array
+        arr = numeric_values[~np.isnan(numeric_values)]
+        if arr.size == 0:
+            return {
+                'min_value': np.nan,
+                'max_value': np.nan,
+                'mean_value': np.nan,
+                'median_value': np.nan,
+                'std_deviation': np.nan
+            }
         
         return {
-            'min_value': numeric_series.min(),
-            'max_value': numeric_series.max(),
-            'mean_value': numeric_series.mean(),
-            'median_value': numeric_series.median(),
-            'std_deviation': numeric_series.std()
+            'min_value': arr.min(),
+            'max_value': arr.max(),
+            'mean_value': arr.mean(),
+            'median_value': np.median(arr),
+            'std_deviation': arr.std(ddof=1) if arr.size > 1 else np.nan
         }
     
-    def _analyze_text_column(self, series: pd.Series) -> Dict[str, Any]:
+    def _analyze_text_column(self, series: pd.Series, non_null: Optional[pd.Series] = None) -> Dict[str, Any]:
         """Analyze text column characteristics."""
-        text_series = series.astype(str)
-        
-        # Calculate text lengths
-        lengths = text_series.str.len()
+        if non_null is None:
+            non_null = series.dropna()
+        if isinstance(non_null.dtype, pd.CategoricalDtype):
+            return self._analyze_categorical_text(non_null)
+        if _is_arrow_backed(non_null.dtype):
+            # Arrow strings compute lengths with a vectorized kernel
+            non_null_text = non_null
+            lengths = non_null_text.str.len().to_numpy(dtype=np.int64)
+        else:
+            non_null_text = non_null.astype(str)
+            
+            # Calculate text lengths into a plain int array, skipping the intermediate Series
+            values = non_null_text.to_numpy()
+            lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
         
         # Detect potential languages (basic heuristic)
-        languages = self._detect_languages(text_series)
+        languages = self._detect_languages(non_null_text)
+        
+        # One C-level ASCII check over the concatenated column instead of one per cell
+        contains_non_ascii = not "".join(non_null_text.tolist()).isascii()
         
         return {
-            'avg_length': lengths.mean(),
-            'min_length': lengths.min(),
-            'max_length': lengths.max(),
+            'avg_length': lengths.sum() / lengths.size if lengths.size else np.nan,
+            'min_length': lengths.min() if lengths.size else np.nan,
+            'max_length': lengths.max() if lengths.size else np.nan,
             'potential_languages': languages,
-            'contains_non_ascii': any(not text.isascii() for text in text_series.dropna())
+            'contains_non_ascii': contains_non_ascii
+        }
+    
+    def _analyze_categorical_text(self, non_null: pd.Series) -> Dict[str, Any]:
+        """Analyze a categorical text column once per category instead of once per row."""
+        categories = non_null.cat.categories.astype(str).to_numpy(dtype=object)
+        counts = np.bincount(non_null.cat.codes.to_numpy(), minlength=len(categories))
+        used = counts > 0
+        category_lengths = np.fromiter(map(len, categories), dtype=np.int64, count=len(categories))
+        used_lengths = category_lengths[used]
+        total = counts.sum()
+        
+        return {
+            'avg_length': (category_lengths * counts).sum() / total if total else np.nan,
+            'min_length': used_lengths.min() if used_lengths.size else np.nan,
+            'max_length': used_lengths.max() if used_lengths.size else np.nan,
+            'potential_languages': self._detect_languages(non_null),
+            'contains_non_ascii': not "".join(categories[used].tolist()).isascii()
         }
     
     def _analyze_datetime_column(self, series: pd.Series) -> Dict[str, Any]:
         """Analyze datetime column characteristics."""
+        # to_datetime keeps the categorical dtype, which has no min/max
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(object)
+        
+        # Convert to datetime, unparsable values become NaT
         try:
-            # Try to convert to datetime
             dt_series = pd.to_datetime(series, errors='coerce')
-            
+        except (ValueError, TypeError):
+            # Mixed UTC offsets (e.g. responses spanning a DST change) only convert in UTC
+            try:
+                dt_series = pd.to_datetime(series, errors='coerce', utc=True)
+            except (ValueError, TypeError):
+                dt_series = pd.Series(pd.NaT, index=series.index)
+        
+        if not dt_series.notna().any():
             return {
-                'min_date': dt_series.min(),
-                'max_date': dt_series.max(),
-                'date_range_days': (dt_series.max() - dt_series.min()).days if dt_series.max() and dt_series.min() else None
+                'min_date': pd.NaT,
+                'max_date': pd.NaT,
+                'date_range_days': None
             }
-        except:
-            return {}
+        
+        min_date = dt_series.min()
+        max_date = dt_series.max()
+        return {
+            'min_date': min_date,
+            'max_date': max_date,
+            'date_range_days': (max_date - min_date).days
+        }
     
     def _detect_languages(self, text_series: pd.Series) -> List[str]:
         """Basic language detection based on character patterns."""
@@ -163,25 +383,14 @@ class CSVAnalyzer:
         
         sample_text = ' '.join(text_series.dropna().head(10).astype(str))
         
-        # Simple heuristics for common languages
-        if re.search(r'[áéíóúñü]', sample_text, re.IGNORECASE):
-            languages.add('Spanish')
-        if re.search(r'[àâäçéèêëïîôùûüÿ]', sample_text, re.IGNORECASE):
-            languages.add('French')
-        if re.search(r'[äöüß]', sample_text, re.IGNORECASE):
-            languages.add('German')
-        if re.search(r'[àèéìíîòóù]', sample_text, re.IGNORECASE):
-            languages.add('Italian')
-        if re.search(r'[ãâáàçéêíôõú]', sample_text, re.IGNORECASE):
-            languages.add('Portuguese')
-        if re.search(r'[а-яё]', sample_text, re.IGNORECASE):
-            languages.add('Russian')
-        if re.search(r'[一-龯]', sample_text):
-            languages.add('Chinese')
-        if re.search(r'[ひらがなカタカナ]', sample_text):
-            languages.add('Japanese')
-        if re.search(r'[가-힣]', sample_text):
-            languages.add('Korean')
+        # Scan the text once for any language-specific character, then check
+        # the few distinct matched characters against each language
+        matched_chars = set(self._lang_chars_re.findall(sample_text))
+        if matched_chars:
+            matched_text = ''.join(matched_chars)
+            for language, probe in self._lang_probes:
+                if probe.search(matched_text):
+                    languages.add(language)
         
         return list(languages) if languages else ['English']
     
@@ -198,39 +407,42 @@ class CSVAnalyzer:
     
     def generate_report(self, analysis: Dict[str, Any]) -> str:
         """Generate a text report of the analysis."""
-        report = []
-        report.append("CSV DATA ANALYSIS REPORT")
-        report.append("=" * 30)
-        report.append(f"Total Rows: {analysis['total_rows']}")
-        report.append(f"Total Columns: {analysis['total_columns']}")
-        report.append(f"Memory Usage: {analysis['memory_usage']}")
-        report.append(f"Missing Values: {analysis['total_missing_values']}")
-        report.append("")
-        
-        report.append("COLUMN BREAKDOWN:")
-        report.append("-" * 20)
-        report.append(f"Text Columns: {len(analysis['text_columns'])}")
-        for col in analysis['text_columns']:
-            report.append(f"  - {col}")
-        
-        report.append(f"Numeric Columns: {len(analysis['numeric_columns'])}")
-        for col in analysis['numeric_columns']:
-            report.append(f"  - {col}")
-        
-        report.append(f"Date Columns: {len(analysis['date_columns'])}")
-        for col in analysis['date_columns']:
-            report.append(f"  - {col}")
-        
-        report.append("")
-        report.append("DETAILED COLUMN ANALYSIS:")
-        report.append("-" * 30)
-        
-        for col_name, col_info in analysis['columns'].items():
-            report.append(f"\nColumn: {col_name}")
-            report.append(f"  Type: {col_info['type']}")
-            report.append(f"  Non-null Count: {col_info['non_null_count']}")
-            report.append(f"  Null Count: {col_info['null_count']}")
-            report.append(f"  Unique Count: {col_info['unique_count']}")
-            report.append(f"  Sample Values: {col_info['sample_values']}")
-        
-        return "\n".join(report)
+        buffer = io.StringIO()
+        write = buffer.write
+        
+        write(
+            "CSV DATA ANALYSIS REPORT\n"
+            f"{'=' * 30}\n"
+            f"Total Rows: {analysis['total_rows']}\n"
+            f"Total Columns: {analysis['total_columns']}\n"
+            f"Memory Usage: {analysis['memory_usage']}\n"
+            f"Missing Values: {analysis['total_missing_values']}\n"
+            "\n"
+            "COLUMN BREAKDOWN:\n"
+            f"{'-' * 20}\n"
+        )
+        
+        for title, key in (("Text", 'text_columns'), ("Numeric", 'numeric_columns'), ("Date", 'date_columns')):
+            write(f"{title} Columns: {len(analysis[key])}\n")
+            for col in analysis[key]:
+                write(f"  - {col}\n")
+        
+        write(
+            "\n"
+            "DETAILED COLUMN ANALYSIS:\n"
+            f"{'-' * 30}"
+        )
+        
+        # One formatted block per column
+        sample_values = analysis['sample_values']
+        for row in analysis['columns_df'].itertuples():
+            write(
+                f"\n\nColumn: {row.Index}\n"
+                f"  Type: {row.type}\n"
+                f"  Non-null Count: {row.non_null_count}\n"
+                f"  Null Count: {row.null_count}\n"
+                f"  Unique Count: {row.unique_count}\n"
+                f"  Sample Values: {sample_values[row.Index]}"
+            )
+        
+        return buffer.getvalue()
@@ -1,8 +1,16 @@
 import pandas as pd
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Optional, Callable
 import time
+import hashlib
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
+from utils.translator_backends.base import TranslationBackend
+from utils.translator_backends.google import GoogleTranslateBackend
+from utils.translator_backends.ct2 import CTranslate2Backend
 
 # Try to import Google Translate, fallback to mock translation if not available
 try:
@@ -11,12 +19,61 @@ try:
 except ImportError:
     GOOGLE_TRANSLATE_AVAILABLE = False
 
+# Try to import langdetect to skip texts already in the target language
+try:
+    from langdetect import DetectorFactory, detect, LangDetectException
+    from langdetect.detector_factory import init_factory
+    DetectorFactory.seed = 0  # make detection deterministic
+    # Load the language profiles now; lazy loading is not thread-safe
+    init_factory()
+    LANGDETECT_AVAILABLE = True
+except ImportError:
+    LANGDETECT_AVAILABLE = False
+
+# Column names that look like form questions
+_QUESTION_RE = re.compile(r'(\?|¿|question|pregunta|texto|text|translated|mango|estás|estas|algo|favor|como|cómo)', re.I)
+
+CACHE_DB_PATH = os.getenv("TRANSLATOR_CACHE_DB", ".translator_cache.db")
+
+@st.cache_resource
+def get_cache_connection(db_path: str = CACHE_DB_PATH) -> Optional[sqlite3.Connection]:
+    """Open the on-disk translation cache, shared across Streamlit reruns."""
+    try:
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.execute("CREATE TABLE IF NOT EXISTS t(k TEXT PRIMARY KEY, v TEXT)")
+        conn.commit()
+        return conn
+    except sqlite3.Error:
+        return None
+
+# sqlite connections are shared between threads, so serialize access to them
+_cache_lock = threading.Lock()
+
+def _cache_key(text: str, target_language: str) -> str:
+    """Build the on-disk cache key for a text and target language."""
+    return hashlib.sha1(f"{target_language}|{text}".encode()).hexdigest()
+
 class TextTranslator:
     """Handles text translation using Google Translate API."""
     
+    # Number of texts sent per translation request
+    BATCH_SIZE = 100
+    # Maximum number of translation requests in flight at once
+    MAX_WORKERS = 8
+    # Maximum number of progress bar updates per translate_dataframe call
+    PROGRESS_UPDATES = 50
+    
     def __init__(self):
         self.translator = None
+        self.backend: Optional[TranslationBackend] = None
         self.api_key = os.getenv("GOOGLE_TRANSLATE_API_KEY", None)
+        # Translations already fetched, keyed by (source text, target language)
+        self._cache: Dict[Tuple[str, str], str] = {}
+        self._cache_db = get_cache_connection()
+        # Translated column names from the last translate_dataframe calls
+        self.column_translations: Dict[str, str] = {}
+        # Set when any text was kept untranslated because translation failed
+        self.had_failures = False
         
         if GOOGLE_TRANSLATE_AVAILABLE:
             try:
@@ -26,6 +83,15 @@ class TextTranslator:
             except Exception as e:
                 st.warning(f"Google Translate initialization failed: {str(e)}")
                 self.translator = None
+        
+        # Prefer a local model when one is configured, keep Google Translate as fallback
+        if CTranslate2Backend.is_available():
+            try:
+                self.backend = CTranslate2Backend()
+            except Exception as e:
+                st.warning(f"Local translation model failed to load: {str(e)}")
+        if self.backend is None and self.translator and GOOGLE_TRANSLATE_AVAILABLE:
+            self.backend = GoogleTranslateBackend(self.translator)
     
     def translate_text(self, text: str, target_language: str = 'en', source_language: str = 'auto') -> str:
         """Translate a single text string."""
@@ -40,23 +106,36 @@ class TextTranslator:
         if len(text_str) < 3:
             return text
         
+        cached = self._get_cached(text_str, target_language)
+        if cached is not None:
+            return cached
+        
+        detected = self._detect_language_code(text_str)
+        if detected == target_language.split('-')[0]:
+            return text_str
+        
         try:
-            if self.translator and GOOGLE_TRANSLATE_AVAILABLE:
-                # Add small delay to avoid rate limiting
-                time.sleep(0.1)
+            if self.backend:
+                # Add small delay to avoid rate limiting of network backends
+                if isinstance(self.backend, GoogleTranslateBackend):
+                    time.sleep(0.1)
                 
-                result = self.translator.translate(
-                    text_str, 
-                    dest=target_language, 
-                    src=source_language
-                )
+                translated = self.backend.translate_batch(
+                    [text_str], target_language, self._backend_source(detected, source_language)
+                )[0]
                 
-                return result.text if result and hasattr(result, 'text') else text_str
+                if translated is not None:
+                    self._store_cached({text_str: translated}, target_language)
+                    return translated
+                self.had_failures = True
+                return text_str
             else:
                 # Fallback: return original text with indication
+                self.had_failures = True
                 return f"[Translation unavailable] {text_str}"
                 
         except Exception as e:
+            self.had_failures = True
             st.warning(f"Translation failed for text '{text_str[:50]}...': {str(e)}")
             return text_str
     
@@ -65,7 +144,8 @@ class TextTranslator:
         if not columns:
             return df
         
-        translated_df = df.copy()
+        # Translated columns, replaced in a shallow copy of df at the end
+        new_columns = {}
         
         # Create progress bar
         total_cells = sum(len(df[col].dropna()) for col in columns if col in df.columns)
@@ -73,6 +153,16 @@ class TextTranslator:
         status_text = st.empty()
         
         processed_cells = 0
+        # Report progress at most ~PROGRESS_UPDATES times regardless of the data size
+        progress_step = 1.0 / self.PROGRESS_UPDATES
+        last_progress = 0.0
+        
+        def report_progress(cells: float) -> None:
+            nonlocal last_progress
+            progress = min(cells / total_cells, 1.0) if total_cells else 1.0
+            if progress - last_progress >= progress_step:
+                progress_bar.progress(progress)
+                last_progress = progress
         
         # Dictionary to store translated column names
         column_translations = {}
@@ -85,55 +175,54 @@ class TextTranslator:
             status_text.text(f"Translating column: {column}")
             
             # Translate column name if it contains question markers (improved detection)
-            col_lower = column.lower()
-            if ('?' in column or '¿' in column or 
-                'texto' in col_lower or 'text' in col_lower or
-                'translated' in col_lower or 'mango' in col_lower or
-                'estás' in col_lower or 'estas' in col_lower or
-                'algo' in col_lower or 'favor' in col_lower or
-                'por favor' in col_lower or 'como' in col_lower or
-                'cómo' in col_lower):
+            if _QUESTION_RE.search(column):
                 translated_column_name = self.translate_text(column, target_language)
                 column_translations[column] = translated_column_name
             
-            # Get non-null values
-            non_null_mask = df[column].notna()
-            non_null_values = df.loc[non_null_mask, column]
+            # Select non-null, non-empty values with vectorized string ops
+            stripped = df[column].astype('string').str.strip()
+            non_null_mask = stripped.notna()
+            translate_mask = non_null_mask & (stripped != '')
+            values_to_translate = stripped[translate_mask]
             
-            translated_values = []
+            # Translate each distinct value once, in batched requests
+            unique_values = values_to_translate.unique()
+            column_cells = int(non_null_mask.sum())
+            translated_count = 0
             
-            for i, value in enumerate(non_null_values):
-                # Only translate non-empty values
-                if pd.isna(value) or str(value).strip() == '':
-                    translated_values.append(value)
-                else:
-                    translated_text = self.translate_text(value, target_language)
-                    translated_values.append(translated_text)
-                
-                processed_cells += 1
-                if processed_cells % 5 == 0:  # Update progress every 5 cells
-                    progress = min(processed_cells / total_cells, 1.0)
-                    progress_bar.progress(progress)
+            def on_batch_done(count: int) -> None:
+                # Spread the column's cells over its distinct values
+                nonlocal translated_count
+                translated_count += count
+                report_progress(processed_cells + column_cells * translated_count / len(unique_values))
+            
+            translated_uniques = self.batch_translate(
+                list(unique_values),
+                target_language,
+                batch_size=self.BATCH_SIZE,
+                progress_callback=on_batch_done
+            )
+            translation_map = dict(zip(unique_values, translated_uniques))
             
-            # Update the DataFrame with translated values
-            translated_df.loc[non_null_mask, column] = translated_values
+            processed_cells += column_cells
+            report_progress(processed_cells)
             
-            # Create a new column with original values for comparison
-            original_column_name = f"{column}_original"
-            if original_column_name not in translated_df.columns:
-                translated_df[original_column_name] = df[column]
+            # Update the DataFrame with translated values in one vectorized write
+            new_columns[column] = df[column].mask(translate_mask, values_to_translate.map(translation_map))
+        
+        # Shallow copy so untouched columns share memory with df; assign() deep-copies on pandas 2
+        translated_df = df.copy(deep=False)
+        for column, translated in new_columns.items():
+            translated_df.isetitem(df.columns.get_loc(column), translated)
         
         # Store column translations for later use
+        self.column_translations.update(column_translations)
         if hasattr(st.session_state, 'column_translations'):
             st.session_state.column_translations.update(column_translations)
         else:
             st.session_state.column_translations = column_translations
         
-        progress_bar.progress(1.0)
-        status_text.text("Translation completed!")
-        
-        # Clear progress indicators after a short delay
-        time.sleep(1)
+        # Clear progress indicators, completion is reported by the caller
         progress_bar.empty()
         status_text.empty()
         
@@ -176,37 +265,205 @@ class TextTranslator:
                 'zh': 'Chinese'
             }
     
-    def batch_translate(self, texts: List[str], target_language: str = 'en', batch_size: int = 10) -> List[str]:
-        """Translate a batch of texts efficiently."""
+    def batch_translate(self, texts: List[str], target_language: str = 'en', batch_size: int = 100,
+                        progress_callback: Optional[Callable[[int], None]] = None) -> List[str]:
+        """Translate a batch of texts efficiently.
+        
+        progress_callback, if given, is called from the calling thread with the
+        number of texts in each batch once that batch is translated.
+        """
         if not texts:
             return []
         
-        translated_texts = []
+        # Each batch is sent as a single request; concurrency is capped by the pool size
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        if len(batches) == 1:
+            results = self._translate_batch(batches[0], target_language)
+            if progress_callback:
+                progress_callback(len(results))
+            return results
         
-        # Process in batches to avoid rate limiting
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            batch_results = []
-            
-            for text in batch:
-                translated = self.translate_text(text, target_language)
-                batch_results.append(translated)
-                
-                # Small delay between translations
-                time.sleep(0.1)
-            
-            translated_texts.extend(batch_results)
+        errors: List[str] = []
+        batch_results = []
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            for results in executor.map(
+                lambda batch: self._translate_batch(batch, target_language, errors=errors),
+                batches
+            ):
+                batch_results.append(results)
+                if progress_callback:
+                    progress_callback(len(results))
+        
+        # Streamlit elements can only be created from the script thread
+        for error in errors:
+            st.warning(error)
+        
+        return [text for batch in batch_results for text in batch]
+    
+    def _translate_batch(self, texts: List[str], target_language: str, source_language: str = 'auto',
+                         errors: Optional[List[str]] = None) -> List[str]:
+        """Translate a list of texts with a single request, keeping untranslatable values as-is."""
+        results = list(texts)
+        
+        # Only send values that translate_text would translate, that are not cached
+        # and that are not already in the target language
+        pending = {}
+        # Source language sent to the backend for each pending text
+        sources = {}
+        for i, text in enumerate(texts):
+            if not text or pd.isna(text):
+                continue
+            text_str = str(text).strip()
+            if len(text_str) < 3:
+                continue
+            cached = self._get_cached(text_str, target_language)
+            if cached is not None:
+                results[i] = cached
+                continue
+            detected = self._detect_language_code(text_str)
+            if detected == target_language.split('-')[0]:
+                results[i] = text_str
+                continue
+            pending[i] = text_str
+            sources[i] = self._backend_source(detected, source_language)
+        
+        if not pending:
+            return results
+        
+        if not self.backend:
+            self.had_failures = True
+            for i, text_str in pending.items():
+                results[i] = f"[Translation unavailable] {text_str}"
+            return results
+        
+        # One request per source language, which is a single group unless the
+        # backend needs the detected language of each text
+        groups: Dict[str, List[int]] = {}
+        for i, source in sources.items():
+            groups.setdefault(source, []).append(i)
+        
+        translated = {}
+        for source, indices in groups.items():
+            group_results = self._request_translations(
+                [pending[i] for i in indices], target_language, source, errors
+            )
+            translated.update(zip(indices, group_results))
+        
+        new_translations = {}
+        for i, translated_text in translated.items():
+            if translated_text is not None:
+                results[i] = translated_text
+                new_translations[pending[i]] = translated_text
+            else:
+                self.had_failures = True
+                results[i] = pending[i]
+        self._store_cached(new_translations, target_language)
+        
+        return results
+    
+    def _request_translations(self, texts: List[str], target_language: str, source_language: str,
+                              errors: Optional[List[str]] = None) -> List[Optional[str]]:
+        """Send texts to the backend, returning None for texts that failed to translate."""
+        last_error = None
+        try:
+            translated = self.backend.translate_batch(texts, target_language, source_language)
+        except Exception as e:
+            # The whole request failed, so retry the texts one at a time
+            last_error = e
+            translated = []
+            for text_str in texts:
+                try:
+                    translated.append(self.backend.translate_batch([text_str], target_language, source_language)[0])
+                except Exception as e:
+                    translated.append(None)
+                    last_error = e
+        
+        failed = sum(1 for text in translated if text is None)
+        if failed:
+            message = f"Translation failed for {failed} of {len(texts)} texts"
+            if last_error is not None:
+                message += f": {str(last_error)}"
+            if errors is None:
+                st.warning(message)
+            else:
+                errors.append(message)
+        return translated
+    
+    def _detect_language_code(self, text: str) -> Optional[str]:
+        """Cheaply detect the language of a text with langdetect, None when unknown."""
+        if not LANGDETECT_AVAILABLE:
+            return None
         
-        return translated_texts
+        try:
+            detected = detect(text)
+        except LangDetectException:
+            return None
+        
+        # langdetect reports regional variants such as 'zh-cn'
+        return detected.split('-')[0]
+    
+    def _backend_source(self, detected: Optional[str], source_language: str) -> str:
+        """Pick the source language passed to the backend for a text.
+        
+        Backends that need a source language get the detected one in place of
+        'auto', so each text is only run through langdetect once.
+        """
+        if source_language == 'auto' and detected and self.backend is not None \
+                and self.backend.needs_source_language:
+            return detected
+        return source_language
+    
+    def _get_cached(self, text: str, target_language: str) -> Optional[str]:
+        """Look up a translation in the memory cache, then in the on-disk cache."""
+        key = (text, target_language)
+        if key in self._cache:
+            return self._cache[key]
+        
+        if self._cache_db is None:
+            return None
+        
+        try:
+            with _cache_lock:
+                row = self._cache_db.execute(
+                    "SELECT v FROM t WHERE k=?", (_cache_key(text, target_language),)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        
+        if row is None:
+            return None
+        self._cache[key] = row[0]
+        return row[0]
+    
+    def _store_cached(self, translations: Dict[str, str], target_language: str) -> None:
+        """Store translations in the memory cache and persist them in one transaction."""
+        if not translations:
+            return
+        
+        for text, translated in translations.items():
+            self._cache[(text, target_language)] = translated
+        
+        if self._cache_db is None:
+            return
+        
+        try:
+            with _cache_lock:
+                self._cache_db.executemany(
+                    "INSERT OR REPLACE INTO t(k, v) VALUES (?, ?)",
+                    [(_cache_key(text, target_language), translated) for text, translated in translations.items()]
+                )
+                self._cache_db.commit()
+        except sqlite3.Error:
+            pass
     
     def is_translation_available(self) -> bool:
         """Check if translation service is available."""
-        return self.translator is not None and GOOGLE_TRANSLATE_AVAILABLE
+        return self.backend is not None
     
     def get_translation_info(self) -> str:
         """Get information about translation service status."""
         if self.is_translation_available():
-            return "✅ Google Translate service is available"
+            return f"✅ {self.backend.name} service is available"
         elif not GOOGLE_TRANSLATE_AVAILABLE:
             return "⚠️ Google Translate library not installed. Install with: pip install googletrans==4.0.0-rc1"
         else:
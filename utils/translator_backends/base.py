@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+
+class TranslationBackend(ABC):
+    """Interface implemented by the translation backends used by TextTranslator."""
+    
+    name = "base"
+    # Whether the backend needs each text's source language instead of 'auto';
+    # TextTranslator then passes the language it detected for the text
+    needs_source_language = False
+    
+    @abstractmethod
+    def translate_batch(self, texts: List[str], target_language: str, source_language: str = 'auto') -> List[Optional[str]]:
+        """Translate a list of texts, returning None for texts the backend could not translate."""
@@ -0,0 +1,90 @@
+import os
+from typing import List, Optional
+
+import streamlit as st
+
+from utils.translator_backends.base import TranslationBackend
+
+# Try to import CTranslate2, the local backend is disabled if not available
+try:
+    import ctranslate2
+    from transformers import AutoTokenizer
+    CT2_AVAILABLE = True
+except ImportError:
+    CT2_AVAILABLE = False
+
+# Path to a CTranslate2-converted NLLB model, e.g. produced with
+# ct2-transformers-converter --model facebook/nllb-200-distilled-600M --quantization int8
+CT2_MODEL_PATH = os.getenv("TRANSLATOR_CT2_MODEL", "")
+CT2_TOKENIZER = os.getenv("TRANSLATOR_CT2_TOKENIZER", "facebook/nllb-200-distilled-600M")
+CT2_DEVICE = os.getenv("TRANSLATOR_CT2_DEVICE", "cpu")
+
+# NLLB language codes for the languages offered in the app
+NLLB_LANGUAGE_CODES = {
+    'en': 'eng_Latn',
+    'es': 'spa_Latn',
+    'fr': 'fra_Latn',
+    'de': 'deu_Latn',
+    'it': 'ita_Latn',
+    'pt': 'por_Latn',
+    'ru': 'rus_Cyrl',
+    'ja': 'jpn_Jpan',
+    'ko': 'kor_Hang',
+    'zh': 'zho_Hans'
+}
+
+# Source tag used when the source language is unknown or not in NLLB_LANGUAGE_CODES
+DEFAULT_SOURCE_CODE = 'eng_Latn'
+
+
+@st.cache_resource
+def load_ct2_model(model_path: str, tokenizer_name: str, device: str = "cpu"):
+    """Load the quantized model and its tokenizer once per process."""
+    translator = ctranslate2.Translator(model_path, device=device, compute_type="int8")
+    tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+    return translator, tokenizer
+
+
+class CTranslate2Backend(TranslationBackend):
+    """Translates texts locally with a CTranslate2 NLLB model."""
+    
+    name = "CTranslate2 (local)"
+    needs_source_language = True
+    
+    def __init__(self, model_path: str = CT2_MODEL_PATH, tokenizer_name: str = CT2_TOKENIZER, device: str = CT2_DEVICE):
+        self.translator, self.tokenizer = load_ct2_model(model_path, tokenizer_name, device)
+    
+    @staticmethod
+    def is_available(model_path: str = CT2_MODEL_PATH) -> bool:
+        """Check if the library is installed and a converted model is present."""
+        return CT2_AVAILABLE and bool(model_path) and os.path.isdir(model_path)
+    
+    def translate_batch(self, texts: List[str], target_language: str, source_language: str = 'auto') -> List[Optional[str]]:
+        """Translate a list of texts in one batch on the local model."""
+        target_code = NLLB_LANGUAGE_CODES.get(target_language)
+        if target_code is None:
+            return [None] * len(texts)
+        
+        # NLLB expects each source sequence to start with its language tag. The tag
+        # is added by hand instead of setting tokenizer.src_lang, which is shared
+        # between translation threads.
+        source_code = NLLB_LANGUAGE_CODES.get(source_language.split('-')[0], DEFAULT_SOURCE_CODE)
+        tokenized = [
+            [source_code] + self.tokenizer.tokenize(text) + [self.tokenizer.eos_token]
+            for text in texts
+        ]
+        
+        async_results = self.translator.translate_batch(
+            tokenized,
+            target_prefix=[[target_code]] * len(tokenized),
+            asynchronous=True
+        )
+        
+        translations = []
+        for async_result in async_results:
+            # Drop the target language token the model emits first
+            tokens = async_result.result().hypotheses[0][1:]
+            translations.append(
+                self.tokenizer.decode(self.tokenizer.convert_tokens_to_ids(tokens), skip_special_tokens=True)
+            )
+        return translations
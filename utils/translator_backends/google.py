@@ -0,0 +1,30 @@
+from typing import List, Optional
+
+from utils.translator_backends.base import TranslationBackend
+
+
+class GoogleTranslateBackend(TranslationBackend):
+    """Translates texts through the googletrans web client."""
+    
+    name = "Google Translate"
+    
+    def __init__(self, translator):
+        self.translator = translator
+    
+    def translate_batch(self, texts: List[str], target_language: str, source_language: str = 'auto') -> List[Optional[str]]:
+        """Translate a list of texts, one request per text.
+        
+        googletrans also sends one request per item for list input and stops at
+        the first failing item, so texts are sent one by one and a failure only
+        leaves that text untranslated. Batching only saves round-trips on the
+        CTranslate2 backend.
+        """
+        translations = []
+        for text in texts:
+            try:
+                result = self.translator.translate(text, dest=target_language, src=source_language)
+            except Exception:
+                translations.append(None)
+                continue
+            translations.append(result.text if result and hasattr(result, 'text') else None)
+        return translations
@@ -6,6 +6,21 @@ from plotly.subplots import make_subplots
 import numpy as np
 from typing import Dict, List, Any
 import re
+from utils.csv_analyzer import shrink_numeric
+
+# Try to import cuDF to compute large correlations on the GPU, fallback to numpy if not available
+try:
+    import cudf
+    CUDF_AVAILABLE = True
+except ImportError:
+    CUDF_AVAILABLE = False
+
+# Minimum number of cells (rows x columns) for which the GPU transfer pays off
+GPU_CORRELATION_MIN_CELLS = 10_000_000
+
+def _as_numeric(df: pd.DataFrame, column: str) -> np.ndarray:
+    """Return df[column] coerced to a float64 array."""
+    return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
 
 class DataVisualizer:
     """Creates interactive visualizations for CSV data."""
@@ -17,7 +32,8 @@ class DataVisualizer:
         """Create a histogram for a numeric column."""
         try:
             # Convert to numeric, handling any string values
-            numeric_data = pd.to_numeric(df[column], errors='coerce').dropna()
+            numeric_values = _as_numeric(df, column)
+            numeric_data = pd.Series(numeric_values[~np.isnan(numeric_values)])
             
             if len(numeric_data) == 0:
                 # Create empty figure with message
@@ -32,11 +48,11 @@ class DataVisualizer:
                 fig.update_layout(title=f"Histogram: {column}")
                 return fig
             
-            fig = px.histogram(
-                x=numeric_data,
+            fig = self._binned_histogram(
+                numeric_data.to_numpy(),
+                nbins=min(50, max(10, len(numeric_data) // 10)),
                 title=f"Distribution of {column}",
-                labels={'x': column, 'count': 'Frequency'},
-                nbins=min(50, max(10, len(numeric_data) // 10))
+                x_label=column
             )
             
             # Add statistics annotations
@@ -77,11 +93,25 @@ class DataVisualizer:
             fig.update_layout(title=f"Histogram: {column}")
             return fig
     
+    def _binned_histogram(self, values: np.ndarray, nbins: int, title: str, x_label: str) -> go.Figure:
+        """Bin values with numpy and plot the counts, so only nbins points reach the browser."""
+        counts, edges = np.histogram(values, bins=nbins)
+        centers = 0.5 * (edges[1:] + edges[:-1])
+        
+        fig = go.Figure(go.Bar(x=centers, y=counts, width=np.diff(edges), name=x_label))
+        fig.update_layout(
+            title=title,
+            xaxis_title=x_label,
+            yaxis_title='Frequency',
+            bargap=0
+        )
+        return fig
+    
     def create_correlation_heatmap(self, df: pd.DataFrame) -> go.Figure:
         """Create a correlation heatmap for numeric columns."""
         try:
             # Select only numeric columns and calculate correlation
-            numeric_df = df.select_dtypes(include=[np.number])
+            numeric_df = shrink_numeric(df.select_dtypes(include=[np.number]))
             
             if numeric_df.empty or len(numeric_df.columns) < 2:
                 fig = go.Figure()
@@ -95,7 +125,7 @@ class DataVisualizer:
                 fig.update_layout(title="Correlation Matrix")
                 return fig
             
-            correlation_matrix = numeric_df.corr()
+            correlation_matrix = self._correlation_matrix(numeric_df)
             
             fig = px.imshow(
                 correlation_matrix,
@@ -125,16 +155,35 @@ class DataVisualizer:
             fig.update_layout(title="Correlation Matrix")
             return fig
     
+    def _correlation_matrix(self, numeric_df: pd.DataFrame) -> pd.DataFrame:
+        """Compute the Pearson correlation matrix on the fastest available path."""
+        if CUDF_AVAILABLE and numeric_df.size >= GPU_CORRELATION_MIN_CELLS:
+            try:
+                return cudf.from_pandas(numeric_df).corr().to_pandas()
+            except Exception:
+                pass
+        
+        arr = np.ascontiguousarray(numeric_df.to_numpy(dtype=np.float64))
+        if np.isnan(arr).any():
+            # pandas handles missing values pairwise, which corrcoef does not
+            return numeric_df.corr()
+        
+        # BLAS-backed single pass over a contiguous float64 buffer; float32 would
+        # show rounding (e.g. 0.99999994 on the diagonal) in the cell labels
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = np.corrcoef(arr, rowvar=False)
+        return pd.DataFrame(correlation, index=numeric_df.columns, columns=numeric_df.columns)
+    
     def create_scatter_plot(self, df: pd.DataFrame, x_col: str, y_col: str, color_col: str = None) -> go.Figure:
         """Create a scatter plot between two numeric columns."""
         try:
-            # Prepare data
-            plot_data = df[[x_col, y_col]].copy()
-            if color_col and color_col in df.columns:
-                plot_data[color_col] = df[color_col]
+            # Prepare data, selecting the needed columns without an extra copy
+            columns = [x_col, y_col]
+            if color_col and color_col in df.columns and color_col not in columns:
+                columns.append(color_col)
             
             # Remove rows with NaN values
-            plot_data = plot_data.dropna()
+            plot_data = df[columns].dropna()
             
             if plot_data.empty:
                 fig = go.Figure()
@@ -176,9 +225,14 @@ class DataVisualizer:
     def create_box_plot(self, df: pd.DataFrame, column: str, group_by: str = None) -> go.Figure:
         """Create a box plot for a numeric column."""
         try:
-            numeric_data = pd.to_numeric(df[column], errors='coerce')
-            valid_data = df[numeric_data.notna()].copy()
-            valid_data[column] = numeric_data[numeric_data.notna()]
+            numeric_data = pd.Series(_as_numeric(df, column), index=df.index)
+            valid_mask = numeric_data.notna()
+            
+            # Only keep the plotted columns of the valid rows
+            columns = [column]
+            if group_by and group_by in df.columns and group_by != column:
+                columns.append(group_by)
+            valid_data = df.loc[valid_mask, columns].assign(**{column: numeric_data[valid_mask]})
             
             if valid_data.empty:
                 fig = go.Figure()
@@ -246,11 +300,11 @@ class DataVisualizer:
                 fig.update_layout(title=f"Text Length Analysis: {column_name}")
                 return fig
             
-            fig = px.histogram(
-                x=lengths,
+            fig = self._binned_histogram(
+                lengths.dropna().to_numpy(dtype=np.float64),
+                nbins=min(30, max(10, len(lengths) // 20)),
                 title=f"Text Length Distribution: {column_name}",
-                labels={'x': 'Text Length (characters)', 'count': 'Frequency'},
-                nbins=min(30, max(10, len(lengths) // 20))
+                x_label='Text Length (characters)'
             )
             
             # Add statistics
@@ -290,7 +344,8 @@ class DataVisualizer:
     def create_value_counts_chart(self, df: pd.DataFrame, column: str, top_n: int = 10) -> go.Figure:
         """Create a bar chart showing value counts for a categorical column."""
         try:
-            value_counts = df[column].value_counts().head(top_n)
+            # Partial top-k selection instead of sorting every distinct value
+            value_counts = df[column].value_counts(sort=False).nlargest(top_n)
             
             if value_counts.empty:
                 fig = go.Figure()
@@ -333,10 +388,11 @@ class DataVisualizer:
     def create_time_series_plot(self, df: pd.DataFrame, date_col: str, value_col: str) -> go.Figure:
         """Create a time series plot."""
         try:
-            # Prepare data
-            plot_data = df[[date_col, value_col]].copy()
-            plot_data[date_col] = pd.to_datetime(plot_data[date_col], errors='coerce')
-            plot_data[value_col] = pd.to_numeric(plot_data[value_col], errors='coerce')
+            # Prepare data from the converted columns directly
+            plot_data = pd.DataFrame({
+                date_col: pd.to_datetime(df[date_col], errors='coerce'),
+                value_col: _as_numeric(df, value_col)
+            }, index=df.index)
             
             # Remove invalid data
             plot_data = plot_data.dropna()